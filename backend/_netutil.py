@@ -0,0 +1,36 @@
+"""
+Port selection shared by the Expense Tracker entry points
+"""
+
+import os
+import socket
+
+# Holds the chosen port so child processes (reloader, workers) reuse it
+PORT_ENV_VAR = 'EXPENSE_TRACKER_PORT'
+
+def is_port_available(port, host='0.0.0.0'):
+    """Check if a port is available"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # Probe the way uvicorn binds, so ports lingering in TIME_WAIT count as free
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind((host, port))
+            return True
+    except OSError:
+        return False
+
+def allocate_port(preferred=8080, host='0.0.0.0'):
+    """Return the preferred port if it is free, otherwise one picked by the OS"""
+    if PORT_ENV_VAR in os.environ:
+        return int(os.environ[PORT_ENV_VAR])
+
+    if is_port_available(preferred, host):
+        port = preferred
+    else:
+        # Binding port 0 lets the kernel hand out a free port in one call
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((host, 0))
+            port = s.getsockname()[1]
+
+    os.environ[PORT_ENV_VAR] = str(port)
+    return port
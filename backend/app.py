@@ -1,12 +1,20 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import List, Optional
-import json
+import asyncio
+import logging
+import orjson
 import os
+import threading
 
-app = FastAPI(title="Expense Tracker API", version="1.0.0")
+from models import ExpenseSummary, today_str
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Expense Tracker API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -22,8 +30,10 @@ class ExpenseCreate(BaseModel):
     description: str = Field(..., min_length=1, description="Expense description")
     amount: float = Field(..., gt=0, description="Expense amount (must be positive)")
     category: str = Field(default="General", description="Expense category")
-    date: str = Field(default_factory=lambda: datetime.now().strftime('%Y-%m-%d'), description="Expense date")
+    date: str = Field(default_factory=today_str, description="Expense date")
 
+# Response models document the API schema only; handlers return plain dicts that
+# are serialized directly instead of being re-validated on the way out
 class ExpenseResponse(BaseModel):
     id: int
     description: str
@@ -41,85 +51,202 @@ class SummaryResponse(BaseModel):
 # In-memory storage for expenses (in production, use a database)
 EXPENSES_FILE = 'expenses.json'
 
+# Parsed contents of EXPENSES_FILE, indexed by ID in file order, plus running
+# aggregates and serialized responses over them; reused until the file's mtime changes
+_cache = {"path": None, "mtime": None, "by_id": None, "summary": None, "next_id": None,
+          "expenses_json": None, "summary_json": None}
+
+def _rebuild_cache(expenses, mtime, next_id=1):
+    """Cache expenses and recompute the aggregates with a full scan"""
+    _cache.update(
+        path=EXPENSES_FILE,
+        mtime=mtime,
+        by_id={e['id']: e for e in expenses},
+        summary=ExpenseSummary.from_expenses(expenses),
+        next_id=max(next_id, max((e['id'] for e in expenses), default=0) + 1),
+        expenses_json=None,
+        summary_json=None
+    )
+
+# Mutations made within this many seconds of each other share one file write
+FLUSH_DELAY = 0.05
+
+# Set while the cache holds changes not yet written; None when no flusher is running
+_dirty = None
+_flusher_task = None
+# True while the flusher's thread is replacing the file
+_writing = False
+_write_lock = threading.Lock()
+
+def _load_cache():
+    """Return the cache, re-reading EXPENSES_FILE if it changed on disk"""
+    if _writing or (_dirty is not None and _dirty.is_set()):
+        # In-memory changes are newer than, or being written to, the file on disk
+        return _cache
+    try:
+        mtime = os.stat(EXPENSES_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _cache["path"] != EXPENSES_FILE or _cache["mtime"] != mtime:
+        stored = {"next_id": 1, "expenses": []}
+        if mtime is not None:
+            with open(EXPENSES_FILE, 'rb') as f:
+                stored = orjson.loads(f.read())
+            # Older files hold just the list; their counter is rebuilt from the IDs
+            if isinstance(stored, list):
+                stored = {"next_id": 1, "expenses": stored}
+        _rebuild_cache(stored["expenses"], mtime, stored["next_id"])
+    return _cache
+
+def _snapshot():
+    """Serialize the cached expenses for writing to JSON file"""
+    # The ID counter is stored too, so IDs of deleted expenses are never handed out again
+    stored = {"next_id": _cache["next_id"], "expenses": list(_cache["by_id"].values())}
+    # Compact output: the file is managed by the app and not meant for hand editing
+    return orjson.dumps(stored)
+
+def _write_file(data, durable=True):
+    """Atomically replace EXPENSES_FILE with data and return its new mtime"""
+    # Write to a temporary file and swap that in so readers never see a partial
+    # file. The fsync makes the swap crash-safe; the lock keeps the shutdown
+    # flush from racing a write still running in the flusher's thread.
+    tmp_file = EXPENSES_FILE + '.tmp'
+    with _write_lock:
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, EXPENSES_FILE)
+        return os.stat(EXPENSES_FILE).st_mtime_ns
+
+def _write_cache(durable=True):
+    """Write the cached expenses to JSON file"""
+    _cache["mtime"] = _write_file(_snapshot(), durable)
+
+def _mark_dirty():
+    """Record a mutation: drop stale responses and schedule the cached expenses to be written"""
+    _cache["expenses_json"] = None
+    _cache["summary_json"] = None
+    if _dirty is None:
+        # No flusher to batch writes, so skip the fsync here on the request path
+        _write_cache(durable=False)
+    else:
+        _dirty.set()
+
+def flush():
+    """Write any pending changes to disk immediately"""
+    if _dirty is not None and _dirty.is_set():
+        _dirty.clear()
+        _write_cache()
+
+async def _flusher():
+    """Coalesce mutations made within FLUSH_DELAY into a single file write"""
+    global _writing
+    while True:
+        await _dirty.wait()
+        await asyncio.sleep(FLUSH_DELAY)
+        _dirty.clear()
+        # Snapshot on the loop so requests cannot mutate the data mid-serialization,
+        # then do the disk I/O off the loop so in-flight requests are not blocked
+        data = _snapshot()
+        _writing = True
+        try:
+            _cache["mtime"] = await asyncio.to_thread(_write_file, data)
+        except Exception:
+            # Keep the changes pending so the next pass retries the write;
+            # letting the task die would leave _dirty set with no writer
+            logger.exception("Failed to save expenses")
+            _dirty.set()
+        finally:
+            _writing = False
+
+@app.on_event("startup")
+async def start_flusher():
+    """Start writing mutations to disk in the background"""
+    global _dirty, _flusher_task
+    _dirty = asyncio.Event()
+    _flusher_task = asyncio.create_task(_flusher())
+
+@app.on_event("shutdown")
+async def stop_flusher():
+    """Stop the background writer and persist anything still pending"""
+    global _dirty, _flusher_task
+    _flusher_task.cancel()
+    flush()
+    _dirty = _flusher_task = None
+
+def _cached_response(state, key, build):
+    """Return state[key] as a JSON response, serializing build() only after a change"""
+    # Mutations and reloads reset state[key], so repeat requests reuse the encoded bytes
+    if state[key] is None:
+        state[key] = orjson.dumps(build())
+    return Response(content=state[key], media_type="application/json")
+
 def load_expenses():
-    """Load expenses from JSON file"""
-    if os.path.exists(EXPENSES_FILE):
-        with open(EXPENSES_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    """Load expenses from JSON file, reusing the cached copy if it is unchanged"""
+    return list(_load_cache()["by_id"].values())
 
 def save_expenses(expenses):
     """Save expenses to JSON file"""
-    with open(EXPENSES_FILE, 'w') as f:
-        json.dump(expenses, f, indent=2)
+    _rebuild_cache(expenses, None)
+    _write_cache()
 
-@app.get("/api/expenses", response_model=List[ExpenseResponse])
+@app.get("/api/expenses", responses={200: {"model": List[ExpenseResponse]}})
 async def get_expenses():
     """Get all expenses"""
-    expenses = load_expenses()
-    return expenses
+    state = _load_cache()
+    return _cached_response(state, "expenses_json", lambda: list(state["by_id"].values()))
 
-@app.post("/api/expenses", response_model=ExpenseResponse, status_code=201)
+@app.post("/api/expenses", status_code=201, responses={201: {"model": ExpenseResponse}})
 async def add_expense(expense: ExpenseCreate):
     """Add a new expense"""
+    state = _load_cache()
     new_expense = {
-        'id': len(load_expenses()) + 1,
+        'id': state["next_id"],
         'description': expense.description,
         'amount': expense.amount,
         'category': expense.category,
         'date': expense.date,
-        'created_at': datetime.now().isoformat()
+        'created_at': datetime.now().isoformat(timespec='seconds')
     }
     
-    expenses = load_expenses()
-    expenses.append(new_expense)
-    save_expenses(expenses)
+    state["next_id"] += 1
+    state["summary"].add(new_expense)
+    state["by_id"][new_expense['id']] = new_expense
+    _mark_dirty()
     
     return new_expense
 
 @app.delete("/api/expenses/{expense_id}")
 async def delete_expense(expense_id: int):
     """Delete an expense by ID"""
-    expenses = load_expenses()
-    expense = next((e for e in expenses if e['id'] == expense_id), None)
+    state = _load_cache()
+    expense = state["by_id"].pop(expense_id, None)
     
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
     
-    expenses = [e for e in expenses if e['id'] != expense_id]
-    save_expenses(expenses)
+    state["summary"].remove(expense)
+    _mark_dirty()
     
     return {"message": "Expense deleted successfully"}
 
-@app.get("/api/expenses/summary", response_model=SummaryResponse)
+@app.get("/api/expenses/summary", responses={200: {"model": SummaryResponse}})
 async def get_summary():
     """Get expense summary statistics"""
-    expenses = load_expenses()
-    
-    if not expenses:
-        return SummaryResponse(
-            total_expenses=0,
-            total_amount=0,
-            average_amount=0,
-            category_breakdown={}
-        )
-    
-    total_amount = sum(e['amount'] for e in expenses)
-    category_breakdown = {}
+    state = _load_cache()
     
-    for expense in expenses:
-        category = expense['category']
-        if category in category_breakdown:
-            category_breakdown[category] += expense['amount']
-        else:
-            category_breakdown[category] = expense['amount']
+    def build():
+        summary = state["summary"]
+        return {
+            'total_expenses': summary.total_expenses,
+            'total_amount': float(summary.total_amount),
+            'average_amount': float(summary.average_amount),
+            'category_breakdown': summary.category_breakdown
+        }
     
-    return SummaryResponse(
-        total_expenses=len(expenses),
-        total_amount=total_amount,
-        average_amount=total_amount / len(expenses),
-        category_breakdown=category_breakdown
-    )
+    return _cached_response(state, "summary_json", build)
 
 @app.get("/")
 async def root():
@@ -128,19 +255,8 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    import socket
-    
-    def find_available_port(start_port=8080, max_attempts=10):
-        """Find an available port starting from start_port"""
-        for port in range(start_port, start_port + max_attempts):
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('localhost', port))
-                    return port
-            except OSError:
-                continue
-        return start_port  # Fallback to start_port
+    from _netutil import allocate_port
     
-    port = find_available_port(8080, 20)
+    port = allocate_port(8080)
     print(f"🚀 Starting FastAPI server on port {port}")
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=port, access_log=False) 
\ No newline at end of file
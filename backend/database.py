@@ -1,118 +1,142 @@
-import json
 import os
+import sqlite3
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from models import today_str
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    description TEXT,
+    amount REAL,
+    category TEXT,
+    date TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_category ON expenses(category);
+CREATE INDEX IF NOT EXISTS idx_date ON expenses(date);
+"""
+
+# RETURNING reports integral REAL values as integers, so cast amount back explicitly
+RETURNING = 'RETURNING id, description, CAST(amount AS REAL) AS amount, category, date, created_at'
+
+# Next to this module, so the location does not depend on the working directory
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'db.sqlite')
+
 class ExpenseDatabase:
-    """Simple file-based database for expense storage"""
-    
-    def __init__(self, file_path: str = 'expenses.json'):
+    """SQLite-backed database for expense storage"""
+
+    def __init__(self, file_path: str = DEFAULT_DB_PATH):
         self.file_path = file_path
-    
+        self.conn = sqlite3.connect(file_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets readers proceed while the API is writing
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying connection"""
+        self.conn.close()
+
     def load_expenses(self) -> List[Dict[str, Any]]:
-        """Load all expenses from file"""
-        if os.path.exists(self.file_path):
-            try:
-                with open(self.file_path, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return []
-        return []
-    
+        """Load all expenses"""
+        rows = self.conn.execute('SELECT * FROM expenses ORDER BY id').fetchall()
+        return [dict(row) for row in rows]
+
     def save_expenses(self, expenses: List[Dict[str, Any]]) -> None:
-        """Save expenses to file"""
-        with open(self.file_path, 'w') as f:
-            json.dump(expenses, f, indent=2)
-    
+        """Replace all stored expenses with the given list"""
+        with self.conn:
+            self.conn.execute('DELETE FROM expenses')
+            self.conn.executemany(
+                'INSERT INTO expenses (id, description, amount, category, date, created_at) '
+                'VALUES (:id, :description, :amount, :category, :date, :created_at)',
+                expenses
+            )
+
     def add_expense(self, expense_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add a new expense"""
-        expenses = self.load_expenses()
-        
-        # Generate new ID
-        new_id = max([e.get('id', 0) for e in expenses], default=0) + 1
-        
-        expense = {
-            'id': new_id,
-            'description': expense_data['description'],
-            'amount': float(expense_data['amount']),
-            'category': expense_data.get('category', 'General'),
-            'date': expense_data.get('date', datetime.now().strftime('%Y-%m-%d')),
-            'created_at': datetime.now().isoformat()
-        }
-        
-        expenses.append(expense)
-        self.save_expenses(expenses)
-        return expense
-    
+        with self.conn:
+            row = self.conn.execute(
+                'INSERT INTO expenses (description, amount, category, date, created_at) '
+                'VALUES (?, ?, ?, ?, ?) ' + RETURNING,
+                (
+                    expense_data['description'],
+                    float(expense_data['amount']),
+                    expense_data.get('category', 'General'),
+                    expense_data['date'] if 'date' in expense_data else today_str(),
+                    datetime.now().isoformat()
+                )
+            ).fetchone()
+        return dict(row)
+
     def get_expense(self, expense_id: int) -> Optional[Dict[str, Any]]:
         """Get expense by ID"""
-        expenses = self.load_expenses()
-        return next((e for e in expenses if e['id'] == expense_id), None)
-    
+        row = self.conn.execute('SELECT * FROM expenses WHERE id = ?', (expense_id,)).fetchone()
+        return dict(row) if row else None
+
     def delete_expense(self, expense_id: int) -> bool:
         """Delete expense by ID"""
-        expenses = self.load_expenses()
-        original_count = len(expenses)
-        
-        expenses = [e for e in expenses if e['id'] != expense_id]
-        
-        if len(expenses) < original_count:
-            self.save_expenses(expenses)
-            return True
-        return False
-    
+        with self.conn:
+            cursor = self.conn.execute('DELETE FROM expenses WHERE id = ?', (expense_id,))
+        return cursor.rowcount > 0
+
     def update_expense(self, expense_id: int, expense_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update expense by ID"""
-        expenses = self.load_expenses()
-        
-        for i, expense in enumerate(expenses):
-            if expense['id'] == expense_id:
-                expenses[i].update({
-                    'description': expense_data.get('description', expense['description']),
-                    'amount': float(expense_data.get('amount', expense['amount'])),
-                    'category': expense_data.get('category', expense['category']),
-                    'date': expense_data.get('date', expense['date'])
-                })
-                self.save_expenses(expenses)
-                return expenses[i]
-        
-        return None
-    
+        amount = expense_data.get('amount')
+
+        # Fields left out of expense_data keep their stored value via COALESCE,
+        # so the lookup and the update happen in one statement
+        with self.conn:
+            row = self.conn.execute(
+                'UPDATE expenses SET description = COALESCE(?, description), '
+                'amount = COALESCE(?, amount), category = COALESCE(?, category), '
+                'date = COALESCE(?, date) WHERE id = ? ' + RETURNING,
+                (
+                    expense_data.get('description'),
+                    float(amount) if amount is not None else None,
+                    expense_data.get('category'),
+                    expense_data.get('date'),
+                    expense_id
+                )
+            ).fetchone()
+        return dict(row) if row else None
+
     def get_expenses_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Get expenses filtered by category"""
-        expenses = self.load_expenses()
-        return [e for e in expenses if e['category'] == category]
-    
+        rows = self.conn.execute(
+            'SELECT * FROM expenses WHERE category = ? ORDER BY id', (category,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
     def get_expenses_by_date_range(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """Get expenses within date range"""
-        expenses = self.load_expenses()
-        return [e for e in expenses if start_date <= e['date'] <= end_date]
-    
+        rows = self.conn.execute(
+            'SELECT * FROM expenses WHERE date BETWEEN ? AND ? ORDER BY id', (start_date, end_date)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
     def get_summary(self) -> Dict[str, Any]:
         """Get expense summary statistics"""
-        expenses = self.load_expenses()
-        
-        if not expenses:
+        total_expenses, total_amount, average_amount = self.conn.execute(
+            'SELECT COUNT(*), SUM(amount), AVG(amount) FROM expenses'
+        ).fetchone()
+
+        if not total_expenses:
             return {
                 'total_expenses': 0,
                 'total_amount': 0,
                 'average_amount': 0,
                 'category_breakdown': {}
             }
-        
-        total_amount = sum(e['amount'] for e in expenses)
-        category_breakdown = {}
-        
-        for expense in expenses:
-            category = expense['category']
-            if category in category_breakdown:
-                category_breakdown[category] += expense['amount']
-            else:
-                category_breakdown[category] = expense['amount']
-        
+
+        category_breakdown = dict(self.conn.execute(
+            'SELECT category, SUM(amount) FROM expenses GROUP BY category'
+        ).fetchall())
+
         return {
-            'total_expenses': len(expenses),
+            'total_expenses': total_expenses,
             'total_amount': total_amount,
-            'average_amount': round(total_amount / len(expenses), 2),
+            'average_amount': round(average_amount, 2),
             'category_breakdown': category_breakdown
-        } 
\ No newline at end of file
+        }
@@ -1,5 +1,17 @@
+from collections import Counter, defaultdict
 from datetime import datetime
 from typing import Optional, Dict, Any
+import time
+
+# Today's date string and the timestamp it was computed at
+_today = [None, 0.0]
+
+def today_str() -> str:
+    """Return today's date as YYYY-MM-DD, reformatting it at most once a second"""
+    now = time.time()
+    if now - _today[1] > 1:
+        _today[:] = [datetime.fromtimestamp(now).date().isoformat(), now]
+    return _today[0]
 
 class Expense:
     """Data model for expense entries"""
@@ -9,7 +21,7 @@ class Expense:
         self.description = description
         self.amount = amount
         self.category = category
-        self.date = date or datetime.now().strftime('%Y-%m-%d')
+        self.date = date or today_str()
         self.id = expense_id
         self.created_at = datetime.now().isoformat()
     
@@ -47,11 +59,13 @@ class ExpenseSummary:
     """Data model for expense summary statistics"""
     
     def __init__(self, total_expenses: int = 0, total_amount: float = 0, 
-                 average_amount: float = 0, category_breakdown: Dict[str, float] = None):
+                 average_amount: float = 0, category_breakdown: Dict[str, float] = None,
+                 category_counts: Dict[str, int] = None):
         self.total_expenses = total_expenses
         self.total_amount = total_amount
         self.average_amount = average_amount
         self.category_breakdown = category_breakdown or {}
+        self.category_counts = category_counts or {}
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert summary to dictionary for JSON serialization"""
@@ -62,25 +76,54 @@ class ExpenseSummary:
             'category_breakdown': self.category_breakdown
         }
     
+    def add(self, expense: Dict[str, Any]) -> None:
+        """Fold a new expense into the running totals"""
+        category = expense['category']
+        self.total_expenses += 1
+        self.total_amount += expense['amount']
+        self.category_breakdown[category] = self.category_breakdown.get(category, 0) + expense['amount']
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.average_amount = self.total_amount / self.total_expenses
+    
+    def remove(self, expense: Dict[str, Any]) -> None:
+        """Take a deleted expense out of the running totals"""
+        category = expense['category']
+        self.total_expenses -= 1
+        self.category_counts[category] -= 1
+        
+        # Drop emptied buckets outright rather than leaving float residue behind
+        if self.category_counts[category] == 0:
+            del self.category_counts[category]
+            del self.category_breakdown[category]
+        else:
+            self.category_breakdown[category] -= expense['amount']
+        
+        if self.total_expenses == 0:
+            self.total_amount = 0
+            self.average_amount = 0
+        else:
+            self.total_amount -= expense['amount']
+            self.average_amount = self.total_amount / self.total_expenses
+    
     @classmethod
     def from_expenses(cls, expenses: list) -> 'ExpenseSummary':
         """Create summary from list of expenses"""
         if not expenses:
             return cls()
         
-        total_amount = sum(expense['amount'] for expense in expenses)
-        category_breakdown = {}
+        category_breakdown = defaultdict(float)
+        category_counts = Counter(expense['category'] for expense in expenses)
         
         for expense in expenses:
-            category = expense['category']
-            if category in category_breakdown:
-                category_breakdown[category] += expense['amount']
-            else:
-                category_breakdown[category] = expense['amount']
+            category_breakdown[expense['category']] += expense['amount']
+        
+        # Totalling the per-category sums avoids another pass over every expense
+        total_amount = sum(category_breakdown.values())
         
         return cls(
             total_expenses=len(expenses),
             total_amount=total_amount,
             average_amount=total_amount / len(expenses),
-            category_breakdown=category_breakdown
+            category_breakdown=dict(category_breakdown),
+            category_counts=dict(category_counts)
         ) 
\ No newline at end of file
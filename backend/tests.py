@@ -1,34 +1,49 @@
 import unittest
 import json
 import os
+import socket
 import tempfile
+from datetime import datetime
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from app import app, load_expenses, save_expenses
+from database import ExpenseDatabase
+from models import today_str
+from _netutil import PORT_ENV_VAR, allocate_port
 
 class ExpenseTrackerTestCase(unittest.TestCase):
     """Test cases for the Expense Tracker API"""
     
-    def setUp(self):
-        """Set up test environment"""
-        from fastapi.testclient import TestClient
-        self.client = TestClient(app)
+    @classmethod
+    def setUpClass(cls):
+        """Set up one client and expenses file shared by all tests"""
+        cls.client = TestClient(app)
         
         # Create a temporary file for testing
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
+        cls.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
+        cls.temp_file.close()
         
         # Patch the expenses file path
-        self.patcher = patch('app.EXPENSES_FILE', self.temp_file.name)
-        self.patcher.start()
-        
-        # Initialize with empty expenses
+        cls.patcher = patch('app.EXPENSES_FILE', cls.temp_file.name)
+        cls.patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests"""
+        cls.patcher.stop()
+        os.unlink(cls.temp_file.name)
+    
+    def setUp(self):
+        """Start each test with empty expenses"""
         save_expenses([])
     
-    def tearDown(self):
-        """Clean up after tests"""
-        self.patcher.stop()
-        os.unlink(self.temp_file.name)
+    def _write_external(self, data):
+        """Overwrite the expenses file as another process would"""
+        with open(self.temp_file.name, 'w') as f:
+            json.dump(data, f)
+        # Move the mtime forward so the change is seen even within the clock's resolution
+        stat = os.stat(self.temp_file.name)
+        os.utime(self.temp_file.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
     
     def test_get_expenses_empty(self):
         """Test getting expenses when none exist"""
@@ -54,6 +69,15 @@ class ExpenseTrackerTestCase(unittest.TestCase):
         self.assertEqual(data['category'], 'General')
         self.assertEqual(data['date'], '2024-01-15')
     
+    def test_add_expense_default_date(self):
+        """Test that an expense without a date is dated today"""
+        now = datetime(2024, 3, 1, 12, 0).timestamp()
+        with patch('models._today', [None, 0.0]), patch('models.time.time', return_value=now):
+            response = self.client.post('/api/expenses', json={'description': 'Test Expense', 'amount': 5})
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['date'], '2024-03-01')
+    
     def test_add_expense_missing_fields(self):
         """Test adding expense with missing required fields"""
         expense_data = {'description': 'Test Expense'}  # Missing amount
@@ -95,6 +119,7 @@ class ExpenseTrackerTestCase(unittest.TestCase):
         
         add_response = self.client.post('/api/expenses', json=expense_data)
         added_expense = add_response.json()
+        self.assertEqual(len(self.client.get('/api/expenses').json()), 1)
         
         # Then delete it
         delete_response = self.client.delete(f'/api/expenses/{added_expense["id"]}')
@@ -110,6 +135,38 @@ class ExpenseTrackerTestCase(unittest.TestCase):
         response = self.client.delete('/api/expenses/999')
         self.assertEqual(response.status_code, 404)
     
+    def test_add_expense_after_delete_gets_unique_id(self):
+        """Test that IDs are not reused after an earlier expense is deleted"""
+        first = self.client.post('/api/expenses', json={'description': 'First', 'amount': 1}).json()
+        second = self.client.post('/api/expenses', json={'description': 'Second', 'amount': 2}).json()
+        self.client.delete(f'/api/expenses/{first["id"]}')
+        
+        third = self.client.post('/api/expenses', json={'description': 'Third', 'amount': 3}).json()
+        
+        self.assertNotEqual(third['id'], second['id'])
+    
+    def test_add_expense_uses_stored_next_id(self):
+        """Test that the persisted ID counter survives reloading the file"""
+        self._write_external({'next_id': 5, 'expenses': []})
+        
+        expense = self.client.post('/api/expenses', json={'description': 'Test', 'amount': 1}).json()
+        
+        self.assertEqual(expense['id'], 5)
+        with open(self.temp_file.name) as f:
+            self.assertEqual(json.load(f)['next_id'], 6)
+    
+    def test_get_expenses_sees_external_changes(self):
+        """Test that edits made to the file outside the app are picked up"""
+        self.assertEqual(self.client.get('/api/expenses').json(), [])
+        
+        external = [{
+            'id': 7, 'description': 'External', 'amount': 5.0, 'category': 'General',
+            'date': '2024-01-15', 'created_at': '2024-01-15T10:00:00'
+        }]
+        self._write_external(external)
+        
+        self.assertEqual(self.client.get('/api/expenses').json(), external)
+    
     def test_get_summary_empty(self):
         """Test getting summary with no expenses"""
         response = self.client.get('/api/expenses/summary')
@@ -142,6 +199,160 @@ class ExpenseTrackerTestCase(unittest.TestCase):
         self.assertIn('Food', data['category_breakdown'])
         self.assertIn('Transportation', data['category_breakdown'])
         self.assertIn('Entertainment', data['category_breakdown'])
+    
+    def test_background_writes_flushed_on_shutdown(self):
+        """Test that changes queued for the background writer reach the file"""
+        with TestClient(app) as client:
+            client.post('/api/expenses', json={'description': 'Queued', 'amount': 5})
+            self.assertEqual(len(client.get('/api/expenses').json()), 1)
+        
+        with open(self.temp_file.name) as f:
+            saved = json.load(f)
+        self.assertEqual([e['description'] for e in saved['expenses']], ['Queued'])
+    
+    def test_get_summary_after_delete(self):
+        """Test that the summary reflects deleted expenses"""
+        food = self.client.post('/api/expenses', json={'description': 'Food', 'amount': 25.00, 'category': 'Food'}).json()
+        self.client.post('/api/expenses', json={'description': 'Gas', 'amount': 35.00, 'category': 'Transportation'})
+        self.client.get('/api/expenses/summary')
+        self.client.delete(f'/api/expenses/{food["id"]}')
+        
+        data = self.client.get('/api/expenses/summary').json()
+        
+        self.assertEqual(data['total_expenses'], 1)
+        self.assertEqual(data['total_amount'], 35.00)
+        self.assertEqual(data['average_amount'], 35.00)
+        self.assertEqual(data['category_breakdown'], {'Transportation': 35.00})
+
+class ExpenseDatabaseTestCase(unittest.TestCase):
+    """Test cases for the SQLite expense database"""
+    
+    def setUp(self):
+        """Set up a fresh database file"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = ExpenseDatabase(os.path.join(self.temp_dir.name, 'test.sqlite'))
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        self.db.close()
+        self.temp_dir.cleanup()
+    
+    def test_add_and_get_expense(self):
+        """Test adding an expense and reading it back by ID"""
+        expense = self.db.add_expense({'description': 'Lunch', 'amount': 12, 'category': 'Food'})
+        
+        self.assertEqual(expense['id'], 1)
+        self.assertEqual(expense['amount'], 12.0)
+        self.assertIsInstance(expense['amount'], float)
+        self.assertEqual(self.db.get_expense(expense['id']), expense)
+        self.assertIsNone(self.db.get_expense(999))
+    
+    def test_add_expense_default_date(self):
+        """Test that an expense without a date gets today's date, and a given date is kept"""
+        with patch('database.today_str', return_value='2024-03-01') as today:
+            dated = self.db.add_expense({'description': 'Lunch', 'amount': 12, 'date': '2024-01-15'})
+            today.assert_not_called()
+            undated = self.db.add_expense({'description': 'Dinner', 'amount': 20})
+        
+        self.assertEqual(dated['date'], '2024-01-15')
+        self.assertEqual(undated['date'], '2024-03-01')
+    
+    def test_delete_expense(self):
+        """Test deleting an expense by ID"""
+        expense = self.db.add_expense({'description': 'Lunch', 'amount': 12})
+        
+        self.assertTrue(self.db.delete_expense(expense['id']))
+        self.assertFalse(self.db.delete_expense(expense['id']))
+        self.assertEqual(self.db.load_expenses(), [])
+    
+    def test_update_expense(self):
+        """Test updating only some fields of an expense"""
+        expense = self.db.add_expense({'description': 'Lunch', 'amount': 12, 'category': 'Food'})
+        
+        updated = self.db.update_expense(expense['id'], {'amount': 15})
+        
+        self.assertEqual(updated['amount'], 15.0)
+        self.assertEqual(updated['description'], 'Lunch')
+        self.assertEqual(updated['category'], 'Food')
+        self.assertIsNone(self.db.update_expense(999, {'amount': 1}))
+    
+    def test_get_summary(self):
+        """Test summary aggregation"""
+        self.assertEqual(self.db.get_summary()['total_expenses'], 0)
+        
+        self.db.add_expense({'description': 'Lunch', 'amount': 10, 'category': 'Food'})
+        self.db.add_expense({'description': 'Dinner', 'amount': 20, 'category': 'Food'})
+        self.db.add_expense({'description': 'Gas', 'amount': 30, 'category': 'Transportation'})
+        
+        summary = self.db.get_summary()
+        self.assertEqual(summary['total_expenses'], 3)
+        self.assertEqual(summary['total_amount'], 60.0)
+        self.assertEqual(summary['average_amount'], 20.0)
+        self.assertEqual(summary['category_breakdown'], {'Food': 30.0, 'Transportation': 30.0})
+    
+    def test_filters(self):
+        """Test category and date range filters"""
+        self.db.add_expense({'description': 'Lunch', 'amount': 10, 'category': 'Food', 'date': '2024-01-10'})
+        self.db.add_expense({'description': 'Gas', 'amount': 30, 'category': 'Transportation', 'date': '2024-02-10'})
+        
+        food = self.db.get_expenses_by_category('Food')
+        self.assertEqual([e['description'] for e in food], ['Lunch'])
+        
+        january = self.db.get_expenses_by_date_range('2024-01-01', '2024-01-31')
+        self.assertEqual([e['description'] for e in january], ['Lunch'])
+
+class TodayStrTestCase(unittest.TestCase):
+    """Test cases for the cached date helper"""
+    
+    def setUp(self):
+        """Start from an empty date cache"""
+        self.cache_patcher = patch('models._today', [None, 0.0])
+        self.cache_patcher.start()
+    
+    def tearDown(self):
+        """Restore the date cache"""
+        self.cache_patcher.stop()
+    
+    def test_refreshes_after_ttl(self):
+        """Test that the cached date is reused within a second and refreshed after"""
+        before_midnight = datetime(2024, 3, 1, 23, 59, 59).timestamp()
+        
+        with patch('models.time.time', return_value=before_midnight):
+            self.assertEqual(today_str(), '2024-03-01')
+        with patch('models.time.time', return_value=before_midnight + 0.5):
+            self.assertEqual(today_str(), '2024-03-01')
+        with patch('models.time.time', return_value=before_midnight + 1.5):
+            self.assertEqual(today_str(), '2024-03-02')
+
+class AllocatePortTestCase(unittest.TestCase):
+    """Test cases for server port selection"""
+    
+    def setUp(self):
+        """Isolate changes to the environment"""
+        self.env_patcher = patch.dict(os.environ)
+        self.env_patcher.start()
+        os.environ.pop(PORT_ENV_VAR, None)
+    
+    def tearDown(self):
+        """Restore the environment"""
+        self.env_patcher.stop()
+    
+    def test_falls_back_when_preferred_port_busy(self):
+        """Test that a busy preferred port is replaced by a free one"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as busy:
+            busy.bind(('0.0.0.0', 0))
+            busy.listen()
+            busy_port = busy.getsockname()[1]
+            
+            port = allocate_port(busy_port)
+        
+        self.assertNotEqual(port, busy_port)
+        self.assertEqual(os.environ[PORT_ENV_VAR], str(port))
+    
+    def test_reuses_port_from_environment(self):
+        """Test that a port chosen earlier is reused by child processes"""
+        os.environ[PORT_ENV_VAR] = '9123'
+        self.assertEqual(allocate_port(8080), 9123)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -10,6 +10,8 @@ import webbrowser
 import time
 from pathlib import Path
 
+from backend._netutil import allocate_port
+
 def check_dependencies():
     """Check if required dependencies are installed"""
     try:
@@ -22,52 +24,22 @@ def check_dependencies():
         print("Please run: pip install -r requirements.txt")
         return False
 
-def check_port_availability(port=8080):
-    """Check if the specified port is available"""
-    import socket
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(('localhost', port))
-            print(f"✅ Port {port} is available")
-            return True
-    except OSError:
-        print(f"❌ Port {port} is in use")
-        return False
-
-def find_available_port(start_port=8080, max_attempts=10):
-    """Find an available port starting from start_port"""
-    import socket
-    for port in range(start_port, start_port + max_attempts):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(('localhost', port))
-                return port
-        except OSError:
-            continue
-    return None
-
 def start_server():
     """Start the FastAPI server"""
     print("🚀 Starting Expense Tracker Server...")
     
-    # Check port availability
-    port = 8080
-    if not check_port_availability(port):
-        print(f"🔍 Looking for an available port...")
-        available_port = find_available_port(8080, 20)
-        if available_port:
-            port = available_port
-            print(f"✅ Found available port: {port}")
-        else:
-            print("❌ No available ports found. Please free up some ports and try again.")
-            return False
+    # Use 8080 if it is free, otherwise any port the OS hands out
+    port = allocate_port(8080)
+    if port == 8080:
+        print(f"✅ Port {port} is available")
+    else:
+        print(f"🔍 Port 8080 is in use, using available port {port}")
     
     # Import and run the FastAPI app
     try:
         import sys
         backend_dir = Path(__file__).parent / "backend"
         sys.path.insert(0, str(backend_dir))
-        from app import app
         import uvicorn
         
         print("✅ Server started successfully!")
@@ -93,7 +65,19 @@ def start_server():
         import threading
         threading.Thread(target=open_browser, daemon=True).start()
         
-        uvicorn.run(app, host="0.0.0.0", port=port, reload=True)
+        # Reloading is for development only: the file watcher keeps polling the
+        # source tree. Set EXPENSE_TRACKER_RELOAD=1 to enable it. Worker count
+        # comes from WEB_CONCURRENCY (default 1). With the default loop and http
+        # settings uvicorn picks uvloop and httptools when they are installed.
+        reload = os.environ.get("EXPENSE_TRACKER_RELOAD") == "1"
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=port,
+            reload=reload,
+            reload_dirs=[str(backend_dir)] if reload else None,
+            access_log=False
+        )
         
     except Exception as e:
         print(f"❌ Error starting server: {e}")